@@ -0,0 +1,205 @@
+import json
+from pathlib import Path
+import subprocess
+import sys
+
+import pytest
+
+from viktualien import cli
+
+_ORDER = {"orderId": "1", "orderDate": "202201011200", "subOrders": []}
+
+
+def _write(path, content):
+    path.write_text(json.dumps(content), encoding="utf-8")
+    return path
+
+
+def test_import_keeps_heavy_modules_unloaded():
+    code = (
+        "import sys\n"
+        "import viktualien.cli, viktualien.config\n"
+        "heavy = {'httpx', 'treelib', 'tqdm', 'plotly'}\n"
+        "print(sorted(heavy & {name.split('.')[0] for name in sys.modules}))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).parents[1],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "[]"
+
+
+@pytest.mark.parametrize(
+    "content, expected",
+    [
+        ([_ORDER, _ORDER], [_ORDER, _ORDER]),
+        ({"orders": [_ORDER, _ORDER]}, [_ORDER, _ORDER]),
+        (_ORDER, [_ORDER]),
+    ],
+)
+def test_load_raw_orders_shapes(tmp_path, content, expected):
+    path = _write(tmp_path / "orders.json", content)
+    assert cli._load_raw_orders([path]) == expected
+
+
+@pytest.mark.parametrize("content", [{"foo": 1}, [1, 2], "orders", {"orders": 1}])
+def test_load_raw_orders_rejects_unknown_shape(tmp_path, content):
+    path = _write(tmp_path / "other.json", content)
+    with pytest.raises(cli.OrdersFileError, match="other.json"):
+        cli._load_raw_orders([path])
+
+
+def test_format_value():
+    assert cli._format_value("price", 1234) == "12.34 €"
+    assert cli._format_value("quantity", 3) == "3"
+
+
+def _args(tmp_path, *args):
+    return ["--no-progress", "--data-path", str(tmp_path / "data"), *args]
+
+
+def test_main_reports_input_errors(tmp_path, capsys):
+    missing = tmp_path / "missing.json"
+    assert cli.main(_args(tmp_path, "narrow", str(missing))) == 1
+    assert "missing.json" in capsys.readouterr().err
+    # Config wird zurückgesetzt, main() ist also mehrfach aufrufbar
+    other = _write(tmp_path / "other.json", {"foo": 1})
+    assert cli.main(_args(tmp_path, "narrow", str(other))) == 1
+    captured = capsys.readouterr()
+    assert "other.json" in captured.err
+    assert captured.out == ""
+
+
+_CATEGORIES = {
+    "topLevelCategories": [
+        {
+            "id": "obst",
+            "name": "Obst",
+            "childCategories": [{"id": "aepfel", "name": "Äpfel"}],
+        },
+        {"id": "getraenke", "name": "Getränke"},
+    ]
+}
+
+# EAN -> Kategorien-IDs bzw. abweichende EAN in der Antwort
+_EANS = {
+    "4000000000001": {"ean": "4000000000001", "categoryIds": ["obst", "aepfel"]},
+    "4000000000002": {"ean": "4000000000009"},
+}
+
+
+def _line_item(product_id, gtin, title, category_id, price, quantity):
+    return {
+        "lineItemType": "PRODUCT",
+        "productId": product_id,
+        "gtin": gtin,
+        "title": title,
+        "price": price,
+        "quantity": quantity,
+        "listing": {"_embedded": {"category": {"id": category_id}}},
+    }
+
+
+def _order(line_items):
+    return {
+        "orderId": "o1",
+        "orderDate": "202201011200",
+        "subOrders": [
+            {"lineItems": line_items + [{"lineItemType": "DELIVERY"}]},
+        ],
+    }
+
+
+_FULL_ORDER = _order(
+    [
+        _line_item("p1", "4000000000001", "Apfel 1kg", "obst", 199, 2),
+        _line_item("p2", "4000000000002", "Wasser 1,5l", "getraenke", 99, 1),
+    ]
+)
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    pytest.importorskip("treelib")
+    pytest.importorskip("httpx")
+    from viktualien.util import cached_http
+
+    def get(uri, params=None, headers=None):  # pylint: disable=unused-argument
+        if uri.endswith("/categories/"):
+            return json.dumps(_CATEGORIES)
+        ean = uri.rsplit("/", 1)[-1]
+        if ean in _EANS:
+            return json.dumps({"items": [_EANS[ean]]})
+        raise cached_http.HTTPError(404)
+
+    monkeypatch.setattr(cached_http, "get", get)
+
+
+def test_fetch(tmp_path, capsys, fake_api):
+    orders = _write(tmp_path / "orders.json", _FULL_ORDER)
+    assert cli.main(_args(tmp_path, "fetch", "--no-narrow", str(orders))) == 0
+    assert capsys.readouterr().out == "4 Kategorien, 1 Bestellungen\n"
+
+
+def test_narrow_keeps_logs_off_stdout(tmp_path, capsys, fake_api):
+    orders = _write(tmp_path / "orders.json", _FULL_ORDER)
+    # Mit Fortschrittsbalken, d.h. Logausgaben über TqdmHandler
+    assert cli.main(["--data-path", str(tmp_path), "narrow", str(orders)]) == 0
+    captured = capsys.readouterr()
+    assert captured.out.splitlines() == [
+        "4000000000001\tApfel 1kg\tÄpfel",
+        "4000000000002\tWasser 1,5l\tGetränke",
+    ]
+    assert "EAN mismatch" in captured.err
+
+
+@pytest.mark.parametrize(
+    "extra, expected",
+    [
+        ([], ["REWE: 4.97 €", "  Obst: 3.98 €", "  Getränke: 0.99 €"]),
+        (
+            ["--narrow"],
+            [
+                "REWE: 4.97 €",
+                "  Obst: 3.98 €",
+                "    Äpfel: 3.98 €",
+                "  Getränke: 0.99 €",
+            ],
+        ),
+        (["--metric", "quantity"], ["REWE: 3", "  Obst: 2", "  Getränke: 1"]),
+    ],
+)
+def test_aggregate(tmp_path, capsys, fake_api, extra, expected):
+    orders = _write(tmp_path / "orders.json", _FULL_ORDER)
+    assert cli.main(_args(tmp_path, "aggregate", *extra, str(orders))) == 0
+    assert capsys.readouterr().out.splitlines() == expected
+
+
+def test_aggregate_and_chart_without_products(tmp_path, capsys, fake_api):
+    orders = _write(tmp_path / "empty.json", _order([]))
+    assert cli.main(_args(tmp_path, "aggregate", str(orders))) == 0
+    assert capsys.readouterr().out == ""
+
+    output = tmp_path / "chart.html"
+    assert cli.main(_args(tmp_path, "chart", "-o", str(output), str(orders))) == 1
+    assert not output.exists()
+    assert "chart.html" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize(
+    "line_item",
+    [
+        {"lineItemType": "PRODUCT"},
+        _line_item("p1", "123", "Apfel 1kg", "obst", 199, 2),
+        _line_item("p1", "4000000000001", "Apfel 1kg", "unbekannt", 199, 2),
+    ],
+)
+def test_malformed_order_names_file(tmp_path, capsys, fake_api, line_item):
+    orders = _write(tmp_path / "bad.json", _order([line_item]))
+    assert cli.main(_args(tmp_path, "narrow", str(orders))) == 1
+    err = capsys.readouterr().err
+    assert "bad.json" in err
+    assert "o1" in err
@@ -0,0 +1,5 @@
+import sys
+
+from viktualien.cli import main
+
+sys.exit(main())
@@ -0,0 +1,270 @@
+import argparse
+import json
+from pathlib import Path
+import sys
+from typing import List, Optional, Sequence, Tuple, Type
+
+from viktualien.config import Config
+
+# Kommandozeilen-Einstiegspunkt, damit die Auswertung auch ohne Jupyter
+# (bspw. per Cron) laufen kann. Aufruf per:
+#   viktualien <Unterbefehl> ...
+#
+# Schwere Abhängigkeiten (httpx, treelib, tqdm, plotly) werden erst in den
+# Unterbefehlen importiert, die sie tatsächlich brauchen.
+
+
+# Fehler beim Einlesen einer Bestelldatei, bspw. bei unbekanntem JSON-Aufbau
+class OrdersFileError(Exception):
+    pass
+
+
+def _check_raw_order(path: Path, raw) -> dict:
+    if not isinstance(raw, dict) or "orderId" not in raw or "subOrders" not in raw:
+        raise OrdersFileError(f"{path}: keine Bestellung im erwarteten Format")
+    return raw
+
+
+# Rohdaten der Bestellungen aus JSON-Dateien laden
+# Jede Datei enthält entweder eine Liste von Bestellungen, ein Objekt mit
+# Schlüssel "orders" oder eine einzelne Bestellung.
+def _load_raw_orders(paths: Sequence[Path]) -> List[dict]:
+    raw_orders: List[dict] = []
+    for path in paths:
+        with path.open(encoding="utf-8") as file:
+            raw = json.load(file)
+        if isinstance(raw, dict) and "orders" in raw:
+            raw = raw["orders"]
+        elif isinstance(raw, dict):
+            raw = [raw]
+        if not isinstance(raw, list):
+            raise OrdersFileError(f"{path}: keine Bestellungen im erwarteten Format")
+        raw_orders.extend(_check_raw_order(path, raw_order) for raw_order in raw)
+    return raw_orders
+
+
+# Kategorienbaum laden und Bestellungen einlesen, optional mit verfeinerten
+# Kategorien
+# Die Dateien werden zuerst gelesen, damit Eingabefehler vor dem ersten
+# HTTP-Zugriff auffallen.
+def _load_orders(args: argparse.Namespace, narrow: bool):
+    raw_files = [(path, _load_raw_orders([path])) for path in args.orders]
+
+    # pylint: disable-next=import-outside-toplevel
+    from treelib.exceptions import NodeIDAbsentError
+
+    # pylint: disable-next=import-outside-toplevel
+    from viktualien.rewe import api, model
+
+    categories = api.load_categories()
+    parsed: List[model.Order] = []
+    for path, raw_orders in raw_files:
+        for raw in raw_orders:
+            try:
+                parsed.append(api.parse_order(raw, categories))
+            except (KeyError, TypeError, ValueError, NodeIDAbsentError) as err:
+                raise OrdersFileError(
+                    f"{path}: Bestellung {raw['orderId']} nicht lesbar ({err!r})"
+                ) from err
+
+    orders = model.Orders(parsed)
+    if narrow:
+        orders = api.narrow_categories_in(categories, orders)
+    return categories, orders
+
+
+# Bestellhistorie nach der gewählten Metrik auf den Kategorienbaum aggregieren
+def _metric_tree(args: argparse.Namespace):
+    from viktualien.rewe import stats  # pylint: disable=import-outside-toplevel
+
+    categories, orders = _load_orders(args, narrow=args.narrow)
+    if args.metric == "quantity":
+        metric = orders.all_line_items.aggregate_add(lambda item: item.quantity)
+    else:
+        metric = orders.all_line_items.aggregate_add(lambda item: item.total_price)
+    return stats.categories_metric(
+        metric,
+        orders.all_product_infos,
+        categories,
+        prune_single=args.prune_single,
+        max_depth=args.max_depth,
+    )
+
+
+def _format_value(metric: str, value: int) -> str:
+    if metric == "quantity":
+        return str(value)
+    return f"{value / 100:.2f} €"
+
+
+# Kategorien und ggf. Produktkategorien abrufen, damit der HTTP-Cache gefüllt ist
+def _cmd_fetch(args: argparse.Namespace) -> int:
+    categories, orders = _load_orders(args, narrow=not args.no_narrow)
+    print(f"{len(categories)} Kategorien, {len(orders)} Bestellungen")
+    return 0
+
+
+# Verfeinerte Kategorie je Produkt ausgeben (tabulatorgetrennt)
+def _cmd_narrow(args: argparse.Namespace) -> int:
+    categories, orders = _load_orders(args, narrow=True)
+    for info in orders.all_product_infos.values():
+        print(info.ean, info.name, categories[info.category_id].tag, sep="\t")
+    return 0
+
+
+# Aggregierten Kategorienbaum als eingerückten Text ausgeben
+def _cmd_aggregate(args: argparse.Namespace) -> int:
+    tree = _metric_tree(args)
+    # Auch der Wurzelknoten wird entfernt, wenn alle Werte 0 sind
+    if len(tree) == 0:
+        return 0
+    for identifier in tree.expand_tree(key=lambda node: -node.data):
+        node = tree[identifier]
+        indent = "  " * tree.depth(node)
+        print(f"{indent}{node.tag}: {_format_value(args.metric, node.data)}")
+    return 0
+
+
+# Treemap als HTML oder (mit kaleido) als Bilddatei schreiben
+def _cmd_chart(args: argparse.Namespace) -> int:
+    tree = _metric_tree(args)
+    if len(tree) == 0:
+        Config.get().logger("cli").error("Keine Daten für %s", args.output)
+        return 1
+
+    from viktualien.rewe import charts  # pylint: disable=import-outside-toplevel
+
+    figure = charts.treechart(tree)
+    if args.output.suffix.lower() in (".html", ".htm"):
+        figure.write_html(str(args.output))
+    else:
+        figure.write_image(str(args.output))
+    return 0
+
+
+def _add_orders_argument(parser: argparse.ArgumentParser, required: bool) -> None:
+    parser.add_argument(
+        "orders",
+        nargs="+" if required else "*",
+        type=Path,
+        metavar="ORDERS",
+        help="JSON-Datei(en) mit Bestellungen",
+    )
+
+
+def _add_metric_arguments(parser: argparse.ArgumentParser) -> None:
+    _add_orders_argument(parser, required=True)
+    parser.add_argument(
+        "--metric",
+        choices=("price", "quantity"),
+        default="price",
+        help="Metrik für die Aggregation (Standard: price)",
+    )
+    parser.add_argument(
+        "--narrow",
+        action="store_true",
+        help="Kategorien per EAN-Abfrage verfeinern",
+    )
+    parser.add_argument(
+        "--prune-single",
+        action="store_true",
+        help="Kategorien mit nur einem Kind zusammenfassen",
+    )
+    parser.add_argument(
+        "--max-depth", type=int, default=None, help="Maximale Tiefe des Baums"
+    )
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="viktualien", description="Analyse von Rewe-Shoppingdaten"
+    )
+    parser.add_argument(
+        "--data-path",
+        type=Path,
+        default=Config.data_path,
+        help="Verzeichnis für den Cache (Standard: data)",
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="Detaillierte Ausgaben loggen"
+    )
+    parser.add_argument(
+        "--no-progress",
+        action="store_true",
+        help="Keine Fortschrittsbalken anzeigen",
+    )
+
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    fetch = subparsers.add_parser(
+        "fetch", help="Kategorien und Produktdaten in den Cache laden"
+    )
+    _add_orders_argument(fetch, required=False)
+    fetch.add_argument(
+        "--no-narrow",
+        action="store_true",
+        help="Keine EAN-Abfragen für die Produkte durchführen",
+    )
+    fetch.set_defaults(func=_cmd_fetch)
+
+    narrow = subparsers.add_parser(
+        "narrow", help="Verfeinerte Kategorie je Produkt ausgeben"
+    )
+    _add_orders_argument(narrow, required=True)
+    narrow.set_defaults(func=_cmd_narrow)
+
+    aggregate = subparsers.add_parser(
+        "aggregate", help="Metrik je Kategorie als Baum ausgeben"
+    )
+    _add_metric_arguments(aggregate)
+    aggregate.set_defaults(func=_cmd_aggregate)
+
+    chart = subparsers.add_parser("chart", help="Metrik je Kategorie als Treemap")
+    _add_metric_arguments(chart)
+    chart.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        required=True,
+        help="Zieldatei (.html, oder Bildformat mit kaleido)",
+    )
+    chart.set_defaults(func=_cmd_chart)
+
+    return parser
+
+
+# Fehlertypen, die als einzeilige Meldung statt als Traceback ausgegeben werden
+# HTTP-Fehler kommen nur vor, wenn ein Unterbefehl cached_http (und damit
+# httpx) bereits geladen hat; andernfalls wird nichts nachgeladen.
+def _expected_errors() -> Tuple[Type[BaseException], ...]:
+    errors: List[Type[BaseException]] = [
+        OSError,
+        json.JSONDecodeError,
+        OrdersFileError,
+    ]
+    cached_http = sys.modules.get("viktualien.util.cached_http")
+    if cached_http is not None:
+        errors += [cached_http.HTTPError, cached_http.httpx.HTTPError]
+    return tuple(errors)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = _parser().parse_args(argv)
+    config = Config.set(
+        Config(
+            data_path=args.data_path,
+            verbose=args.verbose,
+            progress=not args.no_progress,
+        )
+    )
+    try:
+        return args.func(args)
+    except _expected_errors() as err:
+        config.logger("cli").error("%s", str(err) or repr(err))
+        return 1
+    finally:
+        Config.reset()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
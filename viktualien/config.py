@@ -3,10 +3,6 @@ from dataclasses import dataclass
 from typing import ClassVar, Iterable, Optional, TypeVar
 import logging
 
-from tqdm import tqdm
-
-from viktualien.util.tqdm_handler import TqdmHandler
-
 R = TypeVar("R")  # pylint: disable=invalid-name
 
 
@@ -38,6 +34,11 @@ class Config:
         if self.verbose:
             logger.setLevel(logging.INFO)
         if self.progress:
+            # tqdm erst hier importieren, damit Kommandozeilenaufrufe ohne
+            # Fortschrittsbalken schnell starten
+            # pylint: disable-next=import-outside-toplevel
+            from viktualien.util.tqdm_handler import TqdmHandler
+
             handler: logging.Handler = TqdmHandler()
         else:
             handler = logging.StreamHandler()
@@ -52,6 +53,8 @@ class Config:
 
     def meter(self, iterable: Iterable[R]) -> Iterable[R]:
         if self.progress:
+            from tqdm import tqdm  # pylint: disable=import-outside-toplevel
+
             return tqdm(iterable)
         return iterable
 
@@ -61,6 +64,11 @@ class Config:
         Config._config = cfg
         return cfg
 
+    # Gesetzte Konfiguration verwerfen, damit set() erneut aufgerufen werden kann
+    @staticmethod
+    def reset() -> None:
+        Config._config = None
+
     @staticmethod
     def get() -> "Config":
         assert Config._config is not None
@@ -1,12 +1,14 @@
 from logging import StreamHandler, LogRecord
+import sys
 
 from tqdm import tqdm
 
 # Log Handler für TQDM, damit Logausgaben sich nicht mit Fortschrittsbalken mischen
+# Ausgabe wie bei StreamHandler auf stderr, damit stdout frei für Daten bleibt
 class TqdmHandler(StreamHandler):
     def __init__(self):
         StreamHandler.__init__(self)
 
     def emit(self, record: LogRecord):
         msg = self.format(record)
-        tqdm.write(msg)
+        tqdm.write(msg, file=sys.stderr)